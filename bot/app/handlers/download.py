@@ -9,41 +9,60 @@ from config import config
 from app.services.downloader import AudioDownloader
 from app.services.validators import URLValidator
 from app.services.audio_analyzer import AudioAnalyzer
+from app.services.resource_governor import ResourceGovernor
+from app.services.metadata_cache import MetadataCache
 
 logger = logging.getLogger(__name__)
 router = Router()
 
-downloader = AudioDownloader(config)
+governor = ResourceGovernor(config)
+downloader = AudioDownloader(config, governor)
 validator = URLValidator()
-analyzer = AudioAnalyzer()
+analyzer = AudioAnalyzer(governor)
+metadata_cache = MetadataCache(ttl=config.METADATA_CACHE_TTL)
 
 @router.message(F.text)
 async def handle_download(message: types.Message):
-    url = message.text.strip()
+    video_id = validator.extract_video_id(message.text)
     
-    if not validator.is_youtube_url(url):
-        await message.answer("❌ Это не похоже на YouTube ссылку.")
+    if not video_id:
+        await message.answer("❌ Это не похоже на ссылку на YouTube видео.")
         return
     
+    # Повторная ссылка на длинное/приватное видео отклоняется без скачивания
+    cached = metadata_cache.get(video_id)
+    if cached:
+        error_msg = validator.check_metadata(cached, config.MAX_DURATION)
+        if error_msg:
+            await message.answer(f"❌ {error_msg}")
+            return
+    
+    url = validator.canonical_url(video_id)
     status_msg = await message.reply("⏬ Скачиваю аудио...")
     
     try:
-        # is_valid, _, error_msg = await validator.validate_video(url, config.MAX_DURATION)
-        # if not is_valid:
-        #     await status_msg.edit_text(f"❌ {error_msg}")
-        #     return
-        
-        logger.info(f"Начинаем скачивание: {url[:50]}...")
-        
-        result = await downloader.download_audio(url)
+        # Длительность и доступность проверяются до того, как задача займёт ресурсы
+        video_info = await downloader.fetch_info(url)
+        if video_info.metadata:
+            metadata_cache.put(video_id, video_info.metadata)
 
-        if not result.success:
-            await status_msg.edit_text(f"❌ {result.error}")
+        if not video_info.success:
+            await status_msg.edit_text(f"❌ {video_info.error}")
             return
         
-        await status_msg.edit_text("🔍 Анализирую аудио...")
+        logger.info(f"Начинаем скачивание: {url[:50]}...")
         
-        audio_analysis = await analyzer.analyze_audio(result.filename)
+        # Ядра занимаются только на конвертацию и анализ, скачивание идёт параллельно
+        with governor.job():
+            result = await downloader.download_audio(url, video_info.info)
+
+            if not result.success:
+                await status_msg.edit_text(f"❌ {result.error}")
+                return
+            
+            await status_msg.edit_text("🔍 Анализирую аудио...")
+            
+            audio_analysis = await analyzer.analyze_audio(result.filename)
         
         caption = f"🎵 <b>{result.title}</b>"
         
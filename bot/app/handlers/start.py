@@ -59,6 +59,7 @@ async def cmd_help(message: types.Message):
 • https://www.youtube.com/watch?v=...
 • https://youtu.be/...
 • https://youtube.com/shorts/...
+• https://music.youtube.com/watch?v=...
 
 ⚠️ <b>Ограничения:</b>
 - Максимальная длительность: 1 час
@@ -83,7 +84,7 @@ async def process_example_callback(callback: types.CallbackQuery):
 
 <code>https://youtu.be/dQw4w9WgXcQ</code>
 
-<code>https://youtube.com/shorts/abc123def</code>
+<code>https://youtube.com/shorts/dQw4w9WgXcQ</code>
     """
     
     await callback.message.answer(example_text, parse_mode='HTML')
@@ -1,15 +1,18 @@
 import asyncio
 import logging
+from contextlib import nullcontext
 from typing import Dict, Optional
 import numpy as np
 from app.services.key_finder import KeyFinder
+from app.services.resource_governor import ResourceGovernor
 import librosa
 
 logger = logging.getLogger(__name__)
 
 class AudioAnalyzer:
-    def __init__(self):
+    def __init__(self, governor: Optional[ResourceGovernor] = None):
         self.key_finder = KeyFinder()
+        self.governor = governor
 
     async def analyze_audio(self, file_path: str) -> Dict:
         """
@@ -32,10 +35,12 @@ class AudioAnalyzer:
             return self._error_result(str(e))
 
     def _analyze_sync(self, file_path: str) -> Dict:
+        slot = self.governor.cpu_slot() if self.governor else nullcontext()
         try:
-            y, sr = librosa.load(file_path, duration=30, sr=22050)
-            bpm = self._get_bpm_sync(y, sr)
-            key_result = self.key_finder.find_key(file_path, duration=45)
+            with slot:
+                y, sr = librosa.load(file_path, duration=30, sr=22050)
+                bpm = self._get_bpm_sync(y, sr)
+                key_result = self.key_finder.find_key(file_path, duration=45)
 
             result = {
                 'success': True,
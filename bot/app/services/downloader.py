@@ -1,13 +1,21 @@
 import yt_dlp
+from yt_dlp.postprocessor import FFmpegExtractAudioPP
 import os
 import uuid
 import asyncio
+from contextlib import nullcontext
 from dataclasses import dataclass
 from typing import Optional
 import logging
+from app.services.range_downloader import RangeDownloader
+from app.services.metadata_cache import VideoMetadata
+from app.services.validators import URLValidator
+from app.services.resource_governor import ResourceGovernor
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_ENGINES = ('native', 'parallel')
+
 @dataclass
 class DownloadResult:
     success: bool
@@ -16,25 +24,35 @@ class DownloadResult:
     duration: Optional[int] = None
     uploader: Optional[str] = None
     error: Optional[str] = None
+    metadata: Optional[VideoMetadata] = None
+    info: Optional[dict] = None
 
 class AudioDownloader:
-    def __init__(self, config):
+    def __init__(self, config, governor: Optional[ResourceGovernor] = None):
         self.config = config
+        self.governor = governor
         self.download_dir = config.DOWNLOAD_DIR
+        if config.DOWNLOAD_ENGINE not in DOWNLOAD_ENGINES:
+            raise ValueError(
+                f"Неизвестный DOWNLOAD_ENGINE: {config.DOWNLOAD_ENGINE!r}, "
+                f"допустимые значения: {', '.join(DOWNLOAD_ENGINES)}"
+            )
+        self.engine = config.DOWNLOAD_ENGINE
+        self.range_downloader = RangeDownloader(
+            concurrency=config.DOWNLOAD_CONCURRENCY,
+            chunk_size=config.DOWNLOAD_CHUNK_SIZE,
+            retries=config.DOWNLOAD_CHUNK_RETRIES,
+        )
         self._ensure_download_dir()
 
     def _ensure_download_dir(self):
         os.makedirs(self.download_dir, exist_ok=True)
 
-    def _get_ydl_opts(self, file_id: str) -> dict:
-        """Настройки для скачивания M4A аудио"""
+    def _get_ydl_opts(self, file_id: Optional[str] = None) -> dict:
+        """Настройки для скачивания M4A аудио (конвертация в MP3 - в _convert_to_mp3)"""
         return {
             'format': 'bestaudio[ext=m4a]/bestaudio/best',
-            'outtmpl': os.path.join(self.download_dir, f'{file_id}.%(ext)s'),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '320',}],
+            'outtmpl': os.path.join(self.download_dir, f'{file_id or "%(id)s"}.%(ext)s'),
             
             'writethumbnail': False,
             'embedthumbnail': False,
@@ -44,12 +62,77 @@ class AudioDownloader:
             'cachedir': False,
             'socket_timeout': 30,
             'retries': 3,
-            'ignoreerrors': True,
+            # DASH/HLS фрагменты yt-dlp качает сам, параллельно и с докачкой
+            'concurrent_fragment_downloads': self.config.DOWNLOAD_CONCURRENCY,
+            'fragment_retries': self.config.DOWNLOAD_CHUNK_RETRIES,
+            'continuedl': True,
+            # Ошибки извлечения (приватное/удалённое видео) пробрасываются
+            'ignoreerrors': 'only_download',
             'noplaylist': True,
             'extract_flat': False,
         }
 
-    async def download_audio(self, url: str) -> DownloadResult:
+    async def fetch_info(self, url: str) -> DownloadResult:
+        """
+        Получает метаданные без скачивания и проверяет MAX_DURATION и доступность.
+
+        Returns:
+            DownloadResult с metadata (для кэша) и info (для download_audio)
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self._fetch_info_sync, url)
+
+        except Exception as e:
+            logger.error(f"Ошибка в fetch_info: {e}")
+            return DownloadResult(success=False, error=f"Ошибка: {str(e)}")
+
+    def _fetch_info_sync(self, url: str) -> DownloadResult:
+        """Синхронная версия получения метаданных"""
+        try:
+            with yt_dlp.YoutubeDL(self._get_ydl_opts()) as ydl:
+                info = ydl.extract_info(url, download=False)
+
+            metadata = VideoMetadata(
+                title=info.get('title'),
+                duration=info.get('duration'),
+                availability=info.get('availability'),
+            )
+            error = URLValidator.check_metadata(metadata, self.config.MAX_DURATION)
+            if error:
+                return DownloadResult(success=False, error=error, metadata=metadata)
+
+            return DownloadResult(
+                success=True,
+                title=info.get('title', 'Unknown'),
+                duration=info.get('duration', 0),
+                uploader=info.get('uploader', 'Unknown'),
+                metadata=metadata,
+                info=info
+            )
+
+        except yt_dlp.utils.DownloadError as e:
+            availability = URLValidator.availability_from_error(str(e))
+            if availability:
+                metadata = VideoMetadata(availability=availability)
+                return DownloadResult(
+                    success=False,
+                    error=URLValidator.check_metadata(metadata),
+                    metadata=metadata
+                )
+            logger.error(f"Ошибка в _fetch_info_sync: {e}")
+            return DownloadResult(success=False, error=f"Ошибка доступа: {str(e)}")
+
+        except Exception as e:
+            logger.error(f"Ошибка в _fetch_info_sync: {e}")
+            return DownloadResult(success=False, error=f"Ошибка: {str(e)}")
+
+    async def download_audio(self, url: str, info: Optional[dict] = None) -> DownloadResult:
+        """
+        Args:
+            url: YouTube ссылка
+            info: Результат fetch_info; если не передан, метаданные запрашиваются заново
+        """
         try:
             file_id = str(uuid.uuid4())
             ydl_opts = self._get_ydl_opts(file_id)
@@ -61,7 +144,8 @@ class AudioDownloader:
                 self._download_sync, 
                 url, 
                 ydl_opts,
-                file_id
+                file_id,
+                info
             )
             return result
             
@@ -69,18 +153,27 @@ class AudioDownloader:
             logger.error(f"Ошибка в download_audio: {e}")
             return DownloadResult(success=False, error=f"Ошибка: {str(e)}")
 
-    def _download_sync(self, url: str, ydl_opts: dict, file_id: str) -> DownloadResult:
+    def _download_sync(self, url: str, ydl_opts: dict, file_id: str, info: Optional[dict] = None) -> DownloadResult:
         """Синхронная версия скачивания"""
+        if info is None:
+            probe = self._fetch_info_sync(url)
+            if not probe.success:
+                return probe
+            info = probe.info
+
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                ydl.download([url])
-    
-                original_filename =  os.path.join(self.download_dir, f"{file_id}.mp3")
-                
-                if not os.path.exists(original_filename):
-                    logger.error(f"Файл не найден: {original_filename}")
+                if self.engine == 'parallel':
+                    self._download_ranged(ydl, info)
+                # Если файл уже скачан параллельно, yt-dlp пропустит загрузку
+                ydl.process_ie_result(info, download=True)
+
+                source_filename = ydl.prepare_filename(info)
+                if not os.path.exists(source_filename):
+                    logger.error(f"Файл не найден: {source_filename}")
                     return DownloadResult(success=False, error="Файл не создан")
+
+                original_filename = self._convert_to_mp3(ydl, info, source_filename)
                 
                 return DownloadResult(
                     success=True,
@@ -94,6 +187,51 @@ class AudioDownloader:
             logger.error(f"Ошибка в _download_sync: {e}")
             return DownloadResult(success=False, error=f"Ошибка скачивания: {str(e)}")
 
+    def _convert_to_mp3(self, ydl: yt_dlp.YoutubeDL, info: dict, source_filename: str) -> str:
+        """Конвертирует скачанный файл в MP3 в пределах ядер, выделенных ResourceGovernor"""
+        slot = self.governor.cpu_slot() if self.governor else nullcontext(1)
+        with slot as threads:
+            # ffmpeg берёт аргументы из параметров ydl в момент запуска
+            ydl.params['postprocessor_args'] = {'extractaudio': ['-threads', str(threads)]}
+            pp = FFmpegExtractAudioPP(ydl, preferredcodec='mp3', preferredquality='320')
+            files_to_delete, converted = pp.run({**info, 'filepath': source_filename})
+
+        for path in files_to_delete:
+            self.cleanup_file(path)
+        return converted['filepath']
+
+    def _download_ranged(self, ydl: yt_dlp.YoutubeDL, info: dict):
+        """Скачивает выбранный формат параллельными Range-запросами"""
+        if info.get('requested_formats') or info.get('protocol') not in ('http', 'https'):
+            return
+
+        self.range_downloader.cleanup_stale(self.download_dir, self.config.DOWNLOAD_PARTIAL_TTL)
+
+        filename = ydl.prepare_filename(info)
+        # Ключ не зависит от file_id, поэтому повторная ссылка докачивает прошлую попытку
+        key = f"{info['id']}-{info['format_id']}"
+        headers = info.get('http_headers')
+
+        def opener(url: str, request_headers: dict):
+            # Через yt-dlp, чтобы работали его прокси, cookies и обработчики запросов
+            return ydl.urlopen(yt_dlp.networking.Request(url, headers=request_headers))
+
+        try:
+            if not self.range_downloader.download(info['url'], filename, key, headers, opener):
+                logger.info("Сервер не поддерживает Range, качаем одним потоком")
+            return
+        except Exception as e:
+            if not self.range_downloader.has_partial(filename, key):
+                logger.warning(f"Ошибка параллельного скачивания, качаем одним потоком: {e}")
+                return
+            logger.warning(f"Ошибка параллельного скачивания, докачиваем в один поток: {e}")
+
+        # Докачиваем тот же .part; при ошибке он остаётся для следующей попытки
+        try:
+            self.range_downloader.download(info['url'], filename, key, headers, opener, concurrency=1)
+        except Exception as e:
+            logger.warning(f"Докачка не удалась, качаем штатно через yt-dlp: {e}")
+
     def cleanup_file(self, filename: str):
         """Удаляет временный файл"""
         try:
@@ -0,0 +1,43 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class VideoMetadata:
+    title: Optional[str] = None
+    duration: Optional[int] = None
+    availability: Optional[str] = None
+
+
+class MetadataCache:
+    """
+    Кэш метаданных видео с коротким TTL.
+    Позволяет отклонить повторную ссылку (длинное/приватное видео) без скачивания.
+    """
+
+    def __init__(self, ttl: int = 300, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, video_id: str) -> Optional[VideoMetadata]:
+        with self._lock:
+            item = self._items.get(video_id)
+            if item is None:
+                return None
+            expires_at, metadata = item
+            if expires_at < time.monotonic():
+                del self._items[video_id]
+                return None
+            return metadata
+
+    def put(self, video_id: str, metadata: VideoMetadata):
+        with self._lock:
+            self._items[video_id] = (time.monotonic() + self.ttl, metadata)
+            self._items.move_to_end(video_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
@@ -0,0 +1,247 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+PART_SUFFIX = '.ranged.part'
+STATE_SUFFIX = '.ranged.json'
+_CONTENT_RANGE = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+_UNSAFE_KEY_CHARS = re.compile(r'[^\w.-]')
+
+# (url, headers) -> ответ с .status, .headers, .read(n); поддерживает with
+Opener = Callable[[str, Dict[str, str]], object]
+
+
+def urllib_opener(timeout: int = 30) -> Opener:
+    """Открывает запросы через urllib (без прокси и cookies yt-dlp)"""
+    def open_url(url: str, headers: Dict[str, str]):
+        return urlopen(Request(url, headers=headers), timeout=timeout)
+    return open_url
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: int
+    end: int  # включительно
+
+
+@dataclass
+class _KeyLock:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0  # владелец и ожидающие
+
+
+class RangeDownloader:
+    """
+    Скачивает файл параллельными Range-запросами.
+
+    Каждый чанк пишется сразу на своё место в заранее выделенный .part файл,
+    поэтому склейка не требует копирования. Готовые чанки сохраняются в
+    .json рядом с файлом. Имена .part/.json строятся по ключу (например,
+    id видео и формата), поэтому следующая попытка с тем же ключом
+    докачивает только недостающие чанки.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        chunk_size: int = 10 * 1024 * 1024,
+        retries: int = 3,
+        timeout: int = 30,
+        buffer_size: int = 64 * 1024,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = max(1, chunk_size)
+        self.retries = retries
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+        self._key_locks: Dict[str, _KeyLock] = {}
+        self._key_locks_guard = threading.Lock()
+
+    def download(
+        self,
+        url: str,
+        filename: str,
+        key: str,
+        headers: Optional[Dict[str, str]] = None,
+        opener: Optional[Opener] = None,
+        concurrency: Optional[int] = None,
+    ) -> bool:
+        """
+        Args:
+            url: Прямая ссылка на файл
+            filename: Куда сохранить результат
+            key: Стабильный ключ загрузки для докачки
+            headers: Дополнительные HTTP заголовки
+            opener: Чем открывать запросы (по умолчанию urllib)
+            concurrency: Переопределяет число параллельных запросов
+
+        Returns:
+            bool: False, если сервер не поддерживает Range (нужно качать обычным способом)
+
+        При ошибке .part и .json остаются на диске для следующей попытки.
+        """
+        headers = dict(headers or {})
+        opener = opener or urllib_opener(self.timeout)
+        part_path, state_path = self.partial_paths(filename, key)
+
+        # Один и тот же .part не должны писать две загрузки одновременно
+        with self._key_lock(part_path):
+            total_size = self._probe(opener, url, headers)
+            if total_size is None:
+                return False
+
+            chunks = self._split(total_size)
+            done = self._load_state(part_path, state_path, total_size)
+
+            if not done:
+                with open(part_path, 'wb') as f:
+                    f.truncate(total_size)
+
+            pending = [chunk for chunk in chunks if chunk.index not in done]
+            if len(pending) < len(chunks):
+                logger.info(f"Докачка {key}: осталось {len(pending)} из {len(chunks)} чанков")
+
+            lock = threading.Lock()
+
+            def fetch(chunk: Chunk):
+                self._fetch_chunk(opener, url, headers, part_path, chunk)
+                with lock:
+                    done.add(chunk.index)
+                    self._save_state(state_path, total_size, done)
+
+            with ThreadPoolExecutor(max_workers=concurrency or self.concurrency) as executor:
+                # list() пробрасывает первое исключение
+                list(executor.map(fetch, pending))
+
+            os.replace(part_path, filename)
+            self._remove(state_path)
+            return True
+
+    def partial_paths(self, filename: str, key: str) -> tuple:
+        """Пути .part и .json для ключа в каталоге filename"""
+        base = os.path.join(os.path.dirname(filename), _UNSAFE_KEY_CHARS.sub('_', key))
+        return base + PART_SUFFIX, base + STATE_SUFFIX
+
+    def has_partial(self, filename: str, key: str) -> bool:
+        part_path, _ = self.partial_paths(filename, key)
+        return os.path.exists(part_path)
+
+    def cleanup_stale(self, directory: str, max_age: int):
+        """Удаляет незавершённые загрузки, которые не трогали дольше max_age секунд"""
+        now = time.time()
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+
+        for name in names:
+            if not name.endswith((PART_SUFFIX, STATE_SUFFIX, STATE_SUFFIX + '.tmp')):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+                    logger.info(f"Удалена устаревшая незавершённая загрузка: {path}")
+            except OSError:
+                pass
+
+    @contextmanager
+    def _key_lock(self, part_path: str) -> Iterator[None]:
+        """Блокировка на .part; запись удаляется, когда её больше никто не ждёт"""
+        with self._key_locks_guard:
+            entry = self._key_locks.setdefault(part_path, _KeyLock())
+            entry.users += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._key_locks_guard:
+                entry.users -= 1
+                if not entry.users:
+                    del self._key_locks[part_path]
+
+    def _probe(self, opener: Opener, url: str, headers: Dict[str, str]) -> Optional[int]:
+        """Возвращает размер файла, если сервер отвечает на Range кодом 206"""
+        with opener(url, {**headers, 'Range': 'bytes=0-0'}) as response:
+            if response.status != 206:
+                return None
+            match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+            if not match:
+                return None
+            return int(match.group(1))
+
+    def _split(self, total_size: int) -> List[Chunk]:
+        return [
+            Chunk(index, start, min(start + self.chunk_size, total_size) - 1)
+            for index, start in enumerate(range(0, total_size, self.chunk_size))
+        ]
+
+    def _fetch_chunk(self, opener: Opener, url: str, headers: Dict[str, str], part_path: str, chunk: Chunk):
+        """
+        Скачивает чанк с повторами. После обрыва запрос продолжается
+        с последнего записанного байта, а не с начала чанка.
+        """
+        position = chunk.start
+        attempt = 0
+
+        with open(part_path, 'r+b') as f:
+            while position <= chunk.end:
+                try:
+                    with opener(url, {**headers, 'Range': f'bytes={position}-{chunk.end}'}) as response:
+                        if response.status != 206:
+                            raise OSError(f"Сервер вернул {response.status} вместо 206")
+                        f.seek(position)
+                        while position <= chunk.end:
+                            data = response.read(min(self.buffer_size, chunk.end - position + 1))
+                            if not data:
+                                break
+                            f.write(data)
+                            position += len(data)
+                    if position <= chunk.end:
+                        raise OSError("Соединение закрыто до конца чанка")
+
+                except Exception as e:
+                    attempt += 1
+                    if attempt > self.retries:
+                        raise
+                    logger.warning(
+                        f"Чанк {chunk.index}: ошибка ({e}), повтор {attempt}/{self.retries} с байта {position}"
+                    )
+                    time.sleep(min(0.5 * 2 ** (attempt - 1), 5))
+
+    def _load_state(self, part_path: str, state_path: str, total_size: int) -> Set[int]:
+        """Готовые чанки прошлой попытки, если она была с тем же размером чанка"""
+        try:
+            if os.path.getsize(part_path) != total_size:
+                return set()
+            with open(state_path) as f:
+                state = json.load(f)
+            if state.get('total_size') != total_size or state.get('chunk_size') != self.chunk_size:
+                return set()
+            return set(state.get('done', []))
+        except (OSError, ValueError):
+            return set()
+
+    def _save_state(self, state_path: str, total_size: int, done: Set[int]):
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'total_size': total_size, 'chunk_size': self.chunk_size, 'done': sorted(done)}, f)
+        os.replace(tmp_path, state_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,127 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from threadpoolctl import threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceGovernor:
+    """
+    Делит ядра CPU между задачами, чтобы ffmpeg и BLAS/OpenMP
+    не создавали больше потоков, чем есть ядер.
+
+    Задача (job) только учитывается: скачивание и запросы к Telegram
+    не занимают ядра и идут параллельно. Ядра выделяются лишь на время
+    CPU-фаз (cpu_slot): конвертации ffmpeg и анализа. Доля фазы равна
+    total_cores // активные задачи, но не больше свободных ядер, поэтому
+    сумма выданных потоков не превышает total_cores.
+    """
+
+    def __init__(self, config):
+        self.total_cores = max(1, config.CPU_CORES)
+        self.max_threads_per_job = max(1, config.MAX_THREADS_PER_JOB)
+        self._lock = threading.Lock()
+        self._cores_released = threading.Condition(self._lock)
+        self._active_jobs = 0
+        self._allocated = 0
+        self._waiting_slots = 0
+        self._slots: Counter = Counter()
+        self._blas_limiter = None
+        self._blas_limit: Optional[int] = None
+
+    @contextmanager
+    def job(self) -> Iterator[None]:
+        """Учитывает задачу (скачивание + анализ) при делении ядер. Не блокирует."""
+        with self._lock:
+            self._active_jobs += 1
+        logger.info(f"Задача запущена: {self.snapshot()}")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_jobs -= 1
+            logger.info(f"Задача завершена: {self.snapshot()}")
+
+    @contextmanager
+    def cpu_slot(self) -> Iterator[int]:
+        """
+        Выделяет ядра на CPU-фазу. Вызывается из потока executor'а;
+        ждёт, если все ядра заняты.
+
+        Returns:
+            int: количество потоков для фазы
+        """
+        with self._cores_released:
+            self._waiting_slots += 1
+            try:
+                self._cores_released.wait_for(lambda: self._allocated < self.total_cores)
+            finally:
+                self._waiting_slots -= 1
+            threads = self._fair_share()
+            self._allocated += threads
+            self._slots[threads] += 1
+            self._apply_blas_limit()
+
+        try:
+            # OpenMP (libgomp) ограничивается для вызывающего потока,
+            # поэтому лимит ставится в каждом слоте отдельно
+            with threadpool_limits(limits=threads, user_api='openmp'):
+                yield threads
+        finally:
+            with self._cores_released:
+                self._allocated -= threads
+                self._slots[threads] -= 1
+                if not self._slots[threads]:
+                    del self._slots[threads]
+                self._apply_blas_limit()
+                self._cores_released.notify_all()
+
+    def _fair_share(self) -> int:
+        """Вызывать под self._lock"""
+        share = self.total_cores // max(self._active_jobs, 1)
+        free = self.total_cores - self._allocated
+        return max(1, min(share, free, self.max_threads_per_job))
+
+    def _apply_blas_limit(self):
+        """
+        BLAS (OpenBLAS, MKL) ограничивается на весь процесс, поэтому лимит
+        общий: наименьшая доля среди идущих слотов. Исходные значения
+        запоминает первый лимитер и восстанавливает последний вышедший слот.
+        Вызывать под self._lock.
+        """
+        if not self._slots:
+            if self._blas_limiter is not None:
+                self._blas_limiter.restore_original_limits()
+                self._blas_limiter = None
+                self._blas_limit = None
+            return
+
+        limit = min(self._slots)
+        if limit == self._blas_limit:
+            return
+
+        try:
+            if self._blas_limiter is None:
+                self._blas_limiter = threadpool_limits(limits=limit, user_api='blas')
+            else:
+                threadpool_limits(limits=limit, user_api='blas')
+            self._blas_limit = limit
+        except Exception as e:
+            logger.warning(f"Не удалось ограничить потоки BLAS: {e}")
+
+    def snapshot(self) -> Dict:
+        """Текущие настройки и загрузка"""
+        with self._lock:
+            return {
+                'total_cores': self.total_cores,
+                'max_threads_per_job': self.max_threads_per_job,
+                'active_jobs': self._active_jobs,
+                'allocated_cores': self._allocated,
+                'cpu_slots': sum(self._slots.values()),
+                'waiting_slots': self._waiting_slots,
+                'blas_limit': self._blas_limit,
+            }
@@ -2,17 +2,90 @@ import re
 import yt_dlp
 import asyncio
 from typing import Tuple, Optional
+from urllib.parse import urlsplit, parse_qs
+
+from app.services.metadata_cache import VideoMetadata
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+YOUTUBE_HOSTS = {
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+    'youtube-nocookie.com', 'www.youtube-nocookie.com',
+}
+SHORT_HOSTS = {'youtu.be', 'www.youtu.be'}
+# Пути вида /<prefix>/<video_id>
+PATH_PREFIXES = {'shorts', 'embed', 'live', 'v', 'e'}
+PUBLIC_AVAILABILITY = {None, 'public', 'unlisted'}
+
 
 class URLValidator:
+    @staticmethod
+    def extract_video_id(url: str) -> Optional[str]:
+        """
+        Извлекает ID видео из ссылки (watch, youtu.be, shorts, music, embed).
+        Таймкоды и параметры плейлиста игнорируются.
+
+        Returns:
+            str или None, если ссылка не ведёт на видео
+        """
+        url = url.strip()
+        if '://' not in url:
+            url = 'https://' + url
+
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return None
+
+        if parts.scheme not in ('http', 'https'):
+            return None
+
+        host = (parts.hostname or '').lower()
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        if host in SHORT_HOSTS:
+            video_id = segments[0] if len(segments) == 1 else None
+        elif host in YOUTUBE_HOSTS:
+            if segments == ['watch']:
+                video_id = parse_qs(parts.query).get('v', [None])[0]
+            elif len(segments) == 2 and segments[0] in PATH_PREFIXES:
+                video_id = segments[1]
+            else:
+                video_id = None
+        else:
+            video_id = None
+
+        if video_id and VIDEO_ID_RE.match(video_id):
+            return video_id
+        return None
+
+    @staticmethod
+    def canonical_url(video_id: str) -> str:
+        return f"https://www.youtube.com/watch?v={video_id}"
+
     @staticmethod
     def is_youtube_url(url: str) -> bool:
-        """Проверяет, является ли ссылка YouTube ссылкой"""
-        youtube_patterns = [
-            r'^(https?://)?(www\.)?(youtube\.com|youtu\.?be)/.+$',
-            r'^https?://youtu\.be/[^/]+$'
-        ]
-        
-        return any(re.match(pattern, url) for pattern in youtube_patterns)
+        """Проверяет, является ли ссылка ссылкой на YouTube видео"""
+        return URLValidator.extract_video_id(url) is not None
+
+    @staticmethod
+    def check_metadata(metadata: VideoMetadata, max_duration: int = 3600) -> Optional[str]:
+        """Возвращает причину отказа или None, если видео можно скачивать"""
+        if metadata.availability == 'private':
+            return "Это приватное видео"
+        if metadata.availability not in PUBLIC_AVAILABILITY:
+            return "Видео недоступно для скачивания"
+        if metadata.duration and metadata.duration > max_duration:
+            return f"Видео слишком длинное (больше {max_duration // 60} мин)"
+        return None
+
+    @staticmethod
+    def availability_from_error(error: str) -> Optional[str]:
+        """Определяет недоступность видео по тексту ошибки yt-dlp"""
+        if "Private video" in error:
+            return 'private'
+        if "Video unavailable" in error or "This video is not available" in error:
+            return 'unavailable'
+        return None
     
     @staticmethod
     async def validate_video(url: str, max_duration: int = 3600) -> Tuple[bool, Optional[dict], Optional[str]]:
@@ -55,18 +128,19 @@ class URLValidator:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 
-                duration = info.get('duration', 0)
-                if duration > max_duration:
-                    return False, None, f"Видео слишком длинное (больше 1 часа)"
-                
-                # Проверяем доступность
-                if info.get('availability') and info.get('availability') != 'public':
-                    return False, None, "Видео недоступно для скачивания"
+                metadata = VideoMetadata(
+                    title=info.get('title'),
+                    duration=info.get('duration'),
+                    availability=info.get('availability'),
+                )
+                error = URLValidator.check_metadata(metadata, max_duration)
+                if error:
+                    return False, None, error
                 
                 return True, info, None
                 
         except yt_dlp.utils.DownloadError as e:
-            if "Private video" in str(e):
+            if URLValidator.availability_from_error(str(e)) == 'private':
                 return False, None, "Это приватное видео"
             else:
                 return False, None, f"Ошибка доступа: {str(e)}"
\ No newline at end of file
@@ -1,12 +1,59 @@
 import os
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """Лимит CPU из квоты cgroup (docker run --cpus=N), если он задан"""
+    try:
+        # cgroup v2
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota == 'max':
+            return None
+        return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota <= 0 or period <= 0:
+            return None
+        return max(1, quota // period)
+    except (OSError, ValueError):
+        return None
+
+
+def _available_cores() -> int:
+    """Ядра, доступные процессу: cpuset и квота cgroup"""
+    if hasattr(os, 'sched_getaffinity'):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+
+    limit = _cgroup_cpu_limit()
+    return min(cores, limit) if limit else cores
+
 @dataclass
 class Config:
     DOWNLOAD_DIR: str = "downloads"
     MAX_DURATION: int = 3600
+    CPU_CORES: int = int(os.getenv('CPU_CORES', _available_cores()))
+    MAX_THREADS_PER_JOB: int = int(os.getenv('MAX_THREADS_PER_JOB', 4))
+    # 'parallel' - параллельные Range-запросы, 'native' - штатное скачивание yt-dlp
+    DOWNLOAD_ENGINE: str = os.getenv('DOWNLOAD_ENGINE', 'native')
+    DOWNLOAD_CONCURRENCY: int = int(os.getenv('DOWNLOAD_CONCURRENCY', 4))
+    DOWNLOAD_CHUNK_SIZE: int = int(os.getenv('DOWNLOAD_CHUNK_SIZE', 10 * 1024 * 1024))
+    DOWNLOAD_CHUNK_RETRIES: int = int(os.getenv('DOWNLOAD_CHUNK_RETRIES', 3))
+    # Сколько секунд хранить незавершённые загрузки для докачки
+    DOWNLOAD_PARTIAL_TTL: int = int(os.getenv('DOWNLOAD_PARTIAL_TTL', 3600))
+    METADATA_CACHE_TTL: int = int(os.getenv('METADATA_CACHE_TTL', 300))
     
 config = Config()
\ No newline at end of file
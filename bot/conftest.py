@@ -0,0 +1 @@
+# Корень bot/ в sys.path, чтобы тесты импортировали app.* и config так же, как main.py
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import pytest
+
+_RANGE = re.compile(r'bytes=(\d+)-(\d*)')
+
+
+class RangeServer:
+    """
+    Локальный HTTP сервер с поддержкой Range для проверки RangeDownloader.
+
+    Args:
+        payload: Содержимое отдаваемого файла
+        rate: Скорость одного соединения, байт/с (None - без ограничения)
+        drop_after: Обрывать соединение после стольких байт
+        drops: Сколько ответов оборвать
+        fail_after: После стольких запросов отвечать 503
+        ranges: Поддерживать ли Range запросы
+    """
+
+    def __init__(
+        self,
+        payload: bytes,
+        rate: Optional[int] = None,
+        drop_after: Optional[int] = None,
+        drops: int = 0,
+        fail_after: Optional[int] = None,
+        ranges: bool = True,
+    ):
+        self.payload = payload
+        self.rate = rate
+        self.drop_after = drop_after
+        self.drops = drops
+        self.fail_after = fail_after
+        self.ranges = ranges
+        self.requests = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/audio.m4a"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _register(self, length: int) -> str:
+        """Считает запрос и решает, что с ним делать: 'ok', 'drop' или 'fail'"""
+        with self._lock:
+            self.requests += 1
+            if self.fail_after is not None and self.requests > self.fail_after:
+                return 'fail'
+            if self.drop_after is not None and length > self.drop_after and self.drops > 0:
+                self.drops -= 1
+                self.dropped += 1
+                return 'drop'
+            return 'ok'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                size = len(server.payload)
+                start, end = 0, size - 1
+                match = _RANGE.match(self.headers.get('Range', ''))
+                if server.ranges and match:
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)) if match.group(2) else size - 1, size - 1)
+
+                action = server._register(end - start + 1)
+                if action == 'fail':
+                    self.send_error(503)
+                    return
+
+                if server.ranges and match:
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                self._send_body(start, end, action == 'drop')
+
+            def _send_body(self, start: int, end: int, drop: bool):
+                sent = 0
+                position = start
+                began = time.monotonic()
+                try:
+                    while position <= end:
+                        if drop and sent >= server.drop_after:
+                            return
+                        data = server.payload[position:min(position + 16 * 1024, end + 1)]
+                        self.wfile.write(data)
+                        position += len(data)
+                        sent += len(data)
+                        if server.rate:
+                            delay = sent / server.rate - (time.monotonic() - began)
+                            if delay > 0:
+                                time.sleep(delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
+
+
+@pytest.fixture
+def range_server():
+    """Фабрика серверов; все созданные серверы закрываются после теста"""
+    servers = []
+
+    def start(payload: bytes, **kwargs) -> RangeServer:
+        server = RangeServer(payload, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
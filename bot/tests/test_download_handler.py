@@ -0,0 +1,115 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.downloader import DownloadResult
+from app.services.metadata_cache import MetadataCache, VideoMetadata
+
+
+@pytest.fixture
+def handler(monkeypatch, tmp_path):
+    # Модуль создаёт каталог загрузок относительно cwd
+    monkeypatch.chdir(tmp_path)
+    from app.handlers import download
+
+    downloader = MagicMock()
+    downloader.fetch_info = AsyncMock(return_value=DownloadResult(
+        success=True, title='Song', duration=200, metadata=VideoMetadata('Song', 200, 'public'), info={'id': 'x'},
+    ))
+    analyzer = MagicMock()
+    analyzer.analyze_audio = AsyncMock(return_value={'bpm': 120.0, 'key': 'C major'})
+    monkeypatch.setattr(download, 'downloader', downloader)
+    monkeypatch.setattr(download, 'analyzer', analyzer)
+    monkeypatch.setattr(download, 'metadata_cache', MetadataCache(ttl=300))
+    return download
+
+
+def make_message(text: str) -> MagicMock:
+    message = MagicMock()
+    message.text = text
+    message.answer = AsyncMock()
+    message.reply_audio = AsyncMock()
+    status = MagicMock()
+    status.edit_text = AsyncMock()
+    status.delete = AsyncMock()
+    message.reply = AsyncMock(return_value=status)
+    return message
+
+
+def test_concurrent_downloads_are_not_serialized(handler):
+    active = 0
+    peak = 0
+
+    async def download_audio(url, info):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.2)
+        active -= 1
+        return DownloadResult(success=True, filename='song.mp3', title='Song', duration=200)
+
+    handler.downloader.download_audio = download_audio
+    messages = [make_message(f'https://youtu.be/dQw4w9WgXcQ?t={i}') for i in range(4)]
+
+    async def main():
+        began = time.monotonic()
+        await asyncio.gather(*(handler.handle_download(message) for message in messages))
+        return time.monotonic() - began
+
+    elapsed = asyncio.run(main())
+
+    assert peak == 4
+    assert elapsed < 0.4
+    for message in messages:
+        message.reply_audio.assert_awaited_once()
+
+
+@pytest.mark.parametrize('metadata, error', [
+    (VideoMetadata('Long mix', 7200, 'public'), "Видео слишком длинное (больше 60 мин)"),
+    (VideoMetadata(availability='private'), "Это приватное видео"),
+])
+def test_repeated_rejected_link_is_answered_from_cache(handler, metadata, error):
+    handler.downloader.fetch_info = AsyncMock(
+        return_value=DownloadResult(success=False, error=error, metadata=metadata)
+    )
+    handler.downloader.download_audio = AsyncMock()
+
+    first = make_message('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    asyncio.run(handler.handle_download(first))
+    first.reply.return_value.edit_text.assert_awaited_once_with(f"❌ {error}")
+
+    # Та же ссылка в другой форме: ни метаданных, ни скачивания
+    second = make_message('https://youtu.be/dQw4w9WgXcQ?t=5')
+    asyncio.run(handler.handle_download(second))
+
+    second.answer.assert_awaited_once_with(f"❌ {error}")
+    second.reply.assert_not_awaited()
+    handler.downloader.fetch_info.assert_awaited_once()
+    handler.downloader.download_audio.assert_not_awaited()
+
+
+def test_first_seen_long_link_does_not_take_a_job(handler, monkeypatch):
+    handler.downloader.fetch_info = AsyncMock(return_value=DownloadResult(
+        success=False, error="Видео слишком длинное (больше 60 мин)",
+        metadata=VideoMetadata('Long mix', 7200, 'public'),
+    ))
+    handler.downloader.download_audio = AsyncMock()
+    job = MagicMock()
+    monkeypatch.setattr(handler.governor, 'job', job)
+
+    asyncio.run(handler.handle_download(make_message('https://youtu.be/dQw4w9WgXcQ')))
+
+    job.assert_not_called()
+    handler.downloader.download_audio.assert_not_awaited()
+
+
+def test_non_video_link_is_rejected_immediately(handler):
+    message = make_message('https://www.youtube.com/@channel')
+
+    asyncio.run(handler.handle_download(message))
+
+    message.answer.assert_awaited_once()
+    message.reply.assert_not_awaited()
+    handler.downloader.fetch_info.assert_not_awaited()
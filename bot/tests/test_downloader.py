@@ -0,0 +1,97 @@
+from dataclasses import replace
+
+import pytest
+import yt_dlp
+
+from app.services import downloader as downloader_module
+from app.services.downloader import AudioDownloader
+from config import Config
+
+
+def test_unknown_engine_is_rejected(tmp_path):
+    config = replace(Config(), DOWNLOAD_DIR=str(tmp_path), DOWNLOAD_ENGINE='paralel')
+    with pytest.raises(ValueError):
+        AudioDownloader(config)
+
+
+class FakeYoutubeDL:
+    result = None
+
+    def __init__(self, opts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def extract_info(self, url, download=False):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def audio_downloader(monkeypatch, tmp_path):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    return AudioDownloader(replace(Config(), DOWNLOAD_DIR=str(tmp_path), DOWNLOAD_ENGINE='native'))
+
+
+def test_fetch_info_rejects_long_video(audio_downloader, monkeypatch):
+    monkeypatch.setattr(FakeYoutubeDL, 'result', {'title': 'Mix', 'duration': 7200, 'availability': 'public'})
+
+    result = audio_downloader._fetch_info_sync('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    assert not result.success
+    assert result.info is None
+    assert result.metadata.duration == 7200
+
+
+def test_fetch_info_reports_private_video(audio_downloader, monkeypatch):
+    error = yt_dlp.utils.DownloadError("ERROR: [youtube] dQw4w9WgXcQ: Private video")
+    monkeypatch.setattr(FakeYoutubeDL, 'result', error)
+
+    result = audio_downloader._fetch_info_sync('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    assert not result.success
+    assert result.error == "Это приватное видео"
+    assert result.metadata.availability == 'private'
+
+
+def test_fetch_info_returns_info_for_download(audio_downloader, monkeypatch):
+    info = {'id': 'dQw4w9WgXcQ', 'title': 'Song', 'duration': 200, 'availability': 'public'}
+    monkeypatch.setattr(FakeYoutubeDL, 'result', info)
+
+    result = audio_downloader._fetch_info_sync('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+
+    assert result.success
+    assert result.info is info
+    assert result.title == 'Song'
+
+
+class FakeRangeYoutubeDL:
+    def __init__(self, filename):
+        self.filename = filename
+
+    def prepare_filename(self, info):
+        return self.filename
+
+
+def test_failed_resume_falls_back_to_native_download(audio_downloader, tmp_path, monkeypatch, caplog):
+    calls = []
+
+    def failing_download(url, filename, key, headers=None, opener=None, concurrency=None):
+        calls.append(concurrency)
+        raise OSError("ссылка устарела")
+
+    range_downloader = audio_downloader.range_downloader
+    monkeypatch.setattr(range_downloader, 'download', failing_download)
+    monkeypatch.setattr(range_downloader, 'has_partial', lambda filename, key: True)
+    info = {'id': 'dQw4w9WgXcQ', 'format_id': '140', 'protocol': 'https', 'url': 'https://example.com/a'}
+
+    # Не бросает исключение: дальше _download_sync скачивает через yt-dlp
+    audio_downloader._download_ranged(FakeRangeYoutubeDL(str(tmp_path / 'a.m4a')), info)
+
+    assert calls == [None, 1]
+    assert "качаем штатно" in caplog.text
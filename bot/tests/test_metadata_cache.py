@@ -0,0 +1,62 @@
+import pytest
+
+from app.services import metadata_cache
+from app.services.metadata_cache import MetadataCache, VideoMetadata
+from app.services.validators import URLValidator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = MetadataCache(ttl=300)
+    metadata = VideoMetadata(title='Song', duration=200, availability='public')
+    cache.put('dQw4w9WgXcQ', metadata)
+
+    clock[0] += 299
+    assert cache.get('dQw4w9WgXcQ') is metadata
+
+    clock[0] += 2
+    assert cache.get('dQw4w9WgXcQ') is None
+
+
+def test_put_refreshes_ttl(clock):
+    cache = MetadataCache(ttl=300)
+    cache.put('a', VideoMetadata(duration=1))
+    clock[0] += 200
+    cache.put('a', VideoMetadata(duration=2))
+    clock[0] += 200
+
+    assert cache.get('a').duration == 2
+
+
+def test_oldest_entry_is_evicted_over_max_size(clock):
+    cache = MetadataCache(ttl=300, max_size=2)
+    cache.put('a', VideoMetadata(duration=1))
+    cache.put('b', VideoMetadata(duration=2))
+    cache.put('c', VideoMetadata(duration=3))
+
+    assert cache.get('a') is None
+    assert cache.get('b').duration == 2
+    assert cache.get('c').duration == 3
+
+
+def test_missing_entry():
+    assert MetadataCache().get('dQw4w9WgXcQ') is None
+
+
+@pytest.mark.parametrize('metadata', [
+    VideoMetadata(availability='private'),
+    VideoMetadata(title='Long mix', duration=7200, availability='public'),
+])
+def test_cached_private_or_long_entry_fails_check(clock, metadata):
+    cache = MetadataCache(ttl=300)
+    cache.put('dQw4w9WgXcQ', metadata)
+
+    cached = cache.get('dQw4w9WgXcQ')
+    assert cached is not None
+    assert URLValidator.check_metadata(cached, max_duration=3600) is not None
@@ -0,0 +1,134 @@
+import os
+import time
+
+import pytest
+import yt_dlp
+
+from app.services.range_downloader import RangeDownloader
+
+CHUNK_SIZE = 256 * 1024
+PAYLOAD = os.urandom(8 * CHUNK_SIZE)
+CHUNKS = len(PAYLOAD) // CHUNK_SIZE
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def timed_download(server, target: str, concurrency: int) -> float:
+    downloader = RangeDownloader(concurrency=concurrency, chunk_size=CHUNK_SIZE)
+    began = time.monotonic()
+    assert downloader.download(server.url, target, key='video-140')
+    return time.monotonic() - began
+
+
+def test_parallel_download_is_faster_on_throttled_server(range_server, tmp_path):
+    single = range_server(PAYLOAD, rate=1024 * 1024)
+    parallel = range_server(PAYLOAD, rate=1024 * 1024)
+
+    elapsed_single = timed_download(single, str(tmp_path / 'single.m4a'), concurrency=1)
+    elapsed_parallel = timed_download(parallel, str(tmp_path / 'parallel.m4a'), concurrency=4)
+
+    assert read(tmp_path / 'single.m4a') == PAYLOAD
+    assert read(tmp_path / 'parallel.m4a') == PAYLOAD
+    assert elapsed_parallel < elapsed_single
+
+
+def test_dropped_chunks_are_retried(range_server, tmp_path):
+    server = range_server(PAYLOAD, drop_after=64 * 1024, drops=2)
+    target = str(tmp_path / 'audio.m4a')
+
+    downloader = RangeDownloader(concurrency=1, chunk_size=CHUNK_SIZE, retries=2)
+    assert downloader.download(server.url, target, key='video-140')
+
+    assert read(target) == PAYLOAD
+    assert server.dropped == 2
+    # probe + все чанки + по одному повтору на каждый обрыв
+    assert server.requests == 1 + CHUNKS + 2
+    assert sorted(os.listdir(tmp_path)) == ['audio.m4a']
+
+
+def test_failed_download_keeps_partial_and_resumes(range_server, tmp_path):
+    downloader = RangeDownloader(concurrency=1, chunk_size=CHUNK_SIZE, retries=0)
+
+    # probe + 3 чанка, дальше сервер отвечает 503
+    failing = range_server(PAYLOAD, fail_after=4)
+    with pytest.raises(Exception):
+        downloader.download(failing.url, str(tmp_path / 'first.m4a'), key='video-140')
+    assert downloader.has_partial(str(tmp_path / 'first.m4a'), 'video-140')
+
+    # Новая попытка с другим именем файла, но тем же ключом
+    healthy = range_server(PAYLOAD)
+    target = str(tmp_path / 'second.m4a')
+    assert downloader.download(healthy.url, target, key='video-140')
+
+    assert read(target) == PAYLOAD
+    assert healthy.requests == 1 + CHUNKS - 3
+    assert not downloader.has_partial(target, 'video-140')
+
+
+def test_server_without_ranges_falls_back(range_server, tmp_path):
+    server = range_server(PAYLOAD, ranges=False)
+    target = str(tmp_path / 'audio.m4a')
+
+    assert not RangeDownloader(chunk_size=CHUNK_SIZE).download(server.url, target, key='video-140')
+    assert not os.path.exists(target)
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_through_yt_dlp_opener(range_server, tmp_path):
+    server = range_server(PAYLOAD)
+    target = str(tmp_path / 'audio.m4a')
+
+    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        def opener(url, headers):
+            return ydl.urlopen(yt_dlp.networking.Request(url, headers=headers))
+
+        downloader = RangeDownloader(concurrency=4, chunk_size=CHUNK_SIZE)
+        assert downloader.download(server.url, target, key='video-140', opener=opener)
+
+    assert read(target) == PAYLOAD
+
+
+def test_cleanup_stale_removes_only_old_partials(tmp_path):
+    downloader = RangeDownloader()
+    old_part, _ = downloader.partial_paths(str(tmp_path / 'a.m4a'), 'old-140')
+    new_part, _ = downloader.partial_paths(str(tmp_path / 'a.m4a'), 'new-140')
+    for path in (old_part, new_part, str(tmp_path / 'song.mp3')):
+        open(path, 'wb').close()
+    stale = time.time() - 7200
+    os.utime(old_part, (stale, stale))
+    os.utime(tmp_path / 'song.mp3', (stale, stale))
+
+    downloader.cleanup_stale(str(tmp_path), max_age=3600)
+
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(new_part), 'song.mp3'])
+
+
+def test_key_locks_are_released(range_server, tmp_path):
+    downloader = RangeDownloader(concurrency=2, chunk_size=CHUNK_SIZE, retries=0)
+    healthy = range_server(PAYLOAD)
+    failing = range_server(PAYLOAD, fail_after=2)
+
+    assert downloader.download(healthy.url, str(tmp_path / 'a.m4a'), key='a-140')
+    with pytest.raises(Exception):
+        downloader.download(failing.url, str(tmp_path / 'b.m4a'), key='b-140')
+    assert not downloader.download(range_server(PAYLOAD, ranges=False).url, str(tmp_path / 'c.m4a'), key='c-140')
+
+    assert downloader._key_locks == {}
+
+
+def test_same_key_downloads_are_serialized(range_server, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    server = range_server(PAYLOAD, rate=4 * 1024 * 1024)
+    downloader = RangeDownloader(concurrency=2, chunk_size=CHUNK_SIZE)
+    targets = [str(tmp_path / f'{i}.m4a') for i in range(3)]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda target: downloader.download(server.url, target, key='video-140'), targets))
+
+    assert results == [True, True, True]
+    assert all(read(target) == PAYLOAD for target in targets)
+    assert downloader._key_locks == {}
@@ -0,0 +1,114 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import resource_governor
+from app.services.resource_governor import ResourceGovernor
+
+
+def make_governor(cores: int, per_job: int = 4) -> ResourceGovernor:
+    return ResourceGovernor(SimpleNamespace(CPU_CORES=cores, MAX_THREADS_PER_JOB=per_job))
+
+
+def test_jobs_do_not_block_each_other():
+    governor = make_governor(cores=2)
+
+    with governor.job(), governor.job(), governor.job(), governor.job(), governor.job():
+        assert governor.snapshot()['active_jobs'] == 5
+        assert governor.snapshot()['allocated_cores'] == 0
+    assert governor.snapshot()['active_jobs'] == 0
+
+
+@pytest.mark.parametrize('cores, jobs, expected', [
+    (8, 1, 4),   # не больше MAX_THREADS_PER_JOB
+    (8, 2, 4),
+    (8, 3, 2),
+    (8, 4, 2),
+    (4, 8, 1),
+])
+def test_cpu_slot_gets_fair_share_of_cores(cores, jobs, expected):
+    governor = make_governor(cores=cores)
+    for _ in range(jobs):
+        governor._active_jobs += 1
+
+    with governor.cpu_slot() as threads:
+        assert threads == expected
+
+
+def test_allocated_cores_never_exceed_total():
+    governor = make_governor(cores=4)
+    governor._active_jobs = 3
+    peak = []
+
+    def run_slot():
+        with governor.cpu_slot():
+            peak.append(governor.snapshot()['allocated_cores'])
+            time.sleep(0.02)
+
+    workers = [threading.Thread(target=run_slot) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(peak) == 6
+    assert max(peak) <= 4
+    assert governor.snapshot()['allocated_cores'] == 0
+
+
+def test_cpu_slot_waits_until_cores_are_released():
+    governor = make_governor(cores=2)
+    entered = threading.Event()
+
+    def second_slot():
+        with governor.cpu_slot():
+            entered.set()
+
+    with governor.cpu_slot() as threads:
+        assert threads == 2
+        worker = threading.Thread(target=second_slot)
+        worker.start()
+        assert not entered.wait(0.05)
+        assert governor.snapshot()['waiting_slots'] == 1
+    worker.join(1)
+    assert entered.is_set()
+
+
+def test_limits_are_applied_in_every_slot_thread(monkeypatch):
+    calls = []
+
+    class FakeLimits:
+        def __init__(self, limits, user_api):
+            calls.append((threading.get_ident(), user_api, limits))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def restore_original_limits(self):
+            calls.append((threading.get_ident(), 'restore', None))
+
+    monkeypatch.setattr(resource_governor, 'threadpool_limits', FakeLimits)
+    governor = make_governor(cores=8)
+    governor._active_jobs = 2
+    inside = threading.Barrier(2)
+
+    def run_slot():
+        with governor.cpu_slot():
+            inside.wait()
+
+    workers = [threading.Thread(target=run_slot) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    openmp_threads = {ident for ident, api, _ in calls if api == 'openmp'}
+    assert openmp_threads == {worker.ident for worker in workers}
+    assert [limits for _, api, limits in calls if api == 'blas'] == [4]
+    assert calls[-1][1] == 'restore'
+    assert governor.snapshot()['blas_limit'] is None
@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.metadata_cache import VideoMetadata
+from app.services.validators import URLValidator
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s&list=PL123',
+    'http://youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+    'https://m.youtube.com/watch?app=desktop&v=dQw4w9WgXcQ',
+    'https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ?t=10',
+    'youtu.be/dQw4w9WgXcQ?si=abc',
+    'www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com/shorts/dQw4w9WgXcQ?feature=share',
+    'https://www.youtube.com/embed/dQw4w9WgXcQ?start=30',
+    'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ',
+    'https://www.youtube.com/live/dQw4w9WgXcQ?si=xyz',
+    '  https://youtu.be/dQw4w9WgXcQ  ',
+])
+def test_extract_video_id_accepts_video_links(url):
+    assert URLValidator.extract_video_id(url) == VIDEO_ID
+    assert URLValidator.is_youtube_url(url)
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.youtube.com/',
+    'https://www.youtube.com/@channel',
+    'https://www.youtube.com/channel/UC38IQsAvIsxxjztdMZQtwHA',
+    'https://www.youtube.com/results?search_query=lofi',
+    'https://www.youtube.com/playlist?list=PL123',
+    'https://www.youtube.com/watch',
+    'https://www.youtube.com/watch?v=short',
+    'https://youtube.com/shorts/abc123def',
+    'https://youtu.be/',
+    'https://evil.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com.evil.com/watch?v=dQw4w9WgXcQ',
+    'ftp://youtube.com/watch?v=dQw4w9WgXcQ',
+    'привет',
+])
+def test_extract_video_id_rejects_non_video_links(url):
+    assert URLValidator.extract_video_id(url) is None
+    assert not URLValidator.is_youtube_url(url)
+
+
+def test_canonical_url():
+    assert URLValidator.canonical_url(VIDEO_ID) == 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+@pytest.mark.parametrize('metadata, expected', [
+    (VideoMetadata(availability='private'), "Это приватное видео"),
+    (VideoMetadata(availability='unavailable'), "Видео недоступно для скачивания"),
+    (VideoMetadata(availability='needs_auth'), "Видео недоступно для скачивания"),
+    (VideoMetadata(duration=3601, availability='public'), "Видео слишком длинное (больше 60 мин)"),
+    (VideoMetadata(duration=3600, availability='public'), None),
+    (VideoMetadata(duration=200, availability='unlisted'), None),
+    (VideoMetadata(title='No info'), None),
+])
+def test_check_metadata(metadata, expected):
+    assert URLValidator.check_metadata(metadata, max_duration=3600) == expected
+
+
+@pytest.mark.parametrize('error, expected', [
+    ("ERROR: [youtube] abc: Private video. Sign in if you've been granted access", 'private'),
+    ("ERROR: [youtube] abc: Video unavailable", 'unavailable'),
+    ("ERROR: unable to download webpage: timed out", None),
+])
+def test_availability_from_error(error, expected):
+    assert URLValidator.availability_from_error(error) == expected